@@ -1,10 +1,19 @@
 import pygame
 import random
 import math
+import os
+import time
+
+import metrics
+from capture import FrameCapture
+from latency import LatencyTracer
+from masks import collide, get_mask
+from scheduler import Scheduler
 
 # ----- CONFIG -----
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
+FPS = 60
 BRANCH_Y_POSITION = 100
 SWING_RADIUS = 100
 SWING_SPEED = 0.00
@@ -13,25 +22,72 @@ GRAVITY = 0.02
 MAX_DESCEND_SPEED = 0.5
 ANIMAL_SIZE = 60
 GROUND_Y_POSITION = SCREEN_HEIGHT - 40
+LATENCY_TRACE = os.environ.get("LATENCY_TRACE")  # path to write input latency histograms to
+RENDER_SCALE = float(os.environ.get("RENDER_SCALE", "1"))  # draw at this fraction of the window size, upscale once
+CAPTURE = os.environ.get("CAPTURE")  # path to record every presented frame to, see capture.py
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))  # serve Prometheus metrics on localhost:PORT/metrics
+FRAME_BUDGET_MS = 1000 / FPS
+if not 0 < RENDER_SCALE <= 1:
+    raise SystemExit(f"RENDER_SCALE must be above 0 and at most 1, got {RENDER_SCALE}")
 
 # ----- INIT -----
 pygame.init()
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Swinging Branches with Insects")
 clock = pygame.time.Clock()
-font = pygame.font.SysFont("arial", 24)
-bold_font = pygame.font.SysFont("arial", 24, bold=True)
-question_font = pygame.font.SysFont("arial", 18)
+
+# ----- METRICS -----
+registry = metrics.Registry()
+frames_total = registry.counter("catchme_frames_total", "Frames presented")
+frame_seconds = registry.histogram("catchme_frame_seconds", "Time between presented frames",
+                                   [0.008, 0.0125, 0.017, 0.02, 0.025, 0.034, 0.05, 0.1, 0.25])
+frame_work_seconds = registry.histogram("catchme_frame_work_seconds", "Time spent on a frame before waiting",
+                                        [0.001, 0.002, 0.004, 0.008, 0.0125, 0.017, 0.025, 0.05])
+dropped_frames = registry.counter("catchme_dropped_frames_total", f"Frames missed against the {FPS} FPS target")
+questions_served = registry.counter("catchme_questions_served_total", "Questions served", ["type"])
+answers = registry.counter("catchme_answers_total", "Insects caught", ["result"])
+hits = answers.labels(result="hit")
+misses = answers.labels(result="miss")
+lives_lost = registry.counter("catchme_lives_lost_total", "Lives lost")
+asset_load_seconds = registry.histogram("catchme_asset_load_seconds", "Image load and convert time",
+                                        [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1], ["asset"])
+if METRICS_PORT:
+    metrics.serve(registry, METRICS_PORT)
+
+def load_image(path, alpha=True):
+    start = time.perf_counter()
+    image = pygame.image.load(path)
+    image = image.convert_alpha() if alpha else image.convert()
+    asset_load_seconds.labels(asset=path).observe(time.perf_counter() - start)
+    return image
+
+# ----- RENDER TARGET -----
+# Gameplay (rects, collision) stays in window coordinates; only drawing is
+# scaled. Below 1.0 the scene goes to a smaller off-screen surface which is
+# upscaled to the window once per frame.
+def scaled(value):
+    return max(1, round(value * RENDER_SCALE))
+
+def render_pos(pos):
+    return (round(pos[0] * RENDER_SCALE), round(pos[1] * RENDER_SCALE))
+
+RENDER_WIDTH = scaled(SCREEN_WIDTH)
+RENDER_HEIGHT = scaled(SCREEN_HEIGHT)
+frame = screen if RENDER_SCALE == 1 else pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT)).convert()
+
+font = pygame.font.SysFont("arial", scaled(24))
+bold_font = pygame.font.SysFont("arial", scaled(24), bold=True)
+question_font = pygame.font.SysFont("arial", scaled(18))
 
 # ----- IMAGES -----
-background_img = pygame.image.load("bg.png").convert()
-background_img = pygame.transform.scale(background_img, (SCREEN_WIDTH, SCREEN_HEIGHT))
+background_img = load_image("bg.png", alpha=False)
+background_img = pygame.transform.scale(background_img, (RENDER_WIDTH, RENDER_HEIGHT))
 
-congrats_img = pygame.image.load("congrats.jpeg").convert_alpha()
-congrats_img = pygame.transform.scale(congrats_img, (400, 300))
+congrats_img = load_image("congrats.jpeg")
+congrats_img = pygame.transform.scale(congrats_img, (scaled(400), scaled(300)))
 
-gameover_img = pygame.image.load("wegotyou.jpeg").convert_alpha()
-gameover_img = pygame.transform.scale(gameover_img, (400, 300))
+gameover_img = load_image("wegotyou.jpeg")
+gameover_img = pygame.transform.scale(gameover_img, (scaled(400), scaled(300)))
 
 # ----- PLAYER -----
 class Player(pygame.sprite.Sprite):
@@ -41,14 +97,19 @@ class Player(pygame.sprite.Sprite):
         self.swing_speed = SWING_SPEED
         self.descend_speed = 0
 
-        self.swing_img = pygame.image.load("normal.png").convert_alpha()
-        self.descend_img = pygame.image.load("open.png").convert_alpha()
+        self.swing_img = load_image("normal.png")
+        self.descend_img = load_image("open.png")
+
+        self.swing_img = pygame.transform.scale(self.swing_img, (scaled(PLAYER_SIZE), scaled(PLAYER_SIZE)))
+        self.descend_img = pygame.transform.scale(self.descend_img, (scaled(PLAYER_SIZE), scaled(PLAYER_SIZE)))
 
-        self.swing_img = pygame.transform.scale(self.swing_img, (PLAYER_SIZE, PLAYER_SIZE))
-        self.descend_img = pygame.transform.scale(self.descend_img, (PLAYER_SIZE, PLAYER_SIZE))
+        self.swing_mask = get_mask("normal.png", (PLAYER_SIZE, PLAYER_SIZE))
+        self.descend_mask = get_mask("open.png", (PLAYER_SIZE, PLAYER_SIZE))
 
         self.image = self.swing_img
-        self.rect = self.image.get_rect(center=(400, BRANCH_Y_POSITION))
+        self.mask = self.swing_mask
+        self.rect = pygame.Rect(0, 0, PLAYER_SIZE, PLAYER_SIZE)
+        self.rect.center = (400, BRANCH_Y_POSITION)
 
     def update_position(self):
         cx = 400
@@ -68,6 +129,7 @@ class Player(pygame.sprite.Sprite):
                 self.descend_speed = 0
 
         self.image = self.swing_img if self.descend_speed == 0 else self.descend_img
+        self.mask = self.swing_mask if self.descend_speed == 0 else self.descend_mask
         self.update_position()
 
     def descend(self):
@@ -78,6 +140,9 @@ class Player(pygame.sprite.Sprite):
     def stop_descending(self):
         self.descend_speed = 0
 
+    def draw(self, surface):
+        surface.blit(self.image, render_pos(self.rect.topleft))
+
 # ----- ANIMAL -----
 class Animal(pygame.sprite.Sprite):
     def __init__(self, equation, is_correct):
@@ -85,9 +150,11 @@ class Animal(pygame.sprite.Sprite):
         self.equation = equation
         self.is_correct = is_correct
 
-        self.image = pygame.image.load("insect.png").convert_alpha()
-        self.image = pygame.transform.scale(self.image, (ANIMAL_SIZE, ANIMAL_SIZE))
-        self.rect = self.image.get_rect(midbottom=(random.randint(SCREEN_WIDTH, SCREEN_WIDTH + 400), SCREEN_HEIGHT))
+        self.image = load_image("insect.png")
+        self.image = pygame.transform.scale(self.image, (scaled(ANIMAL_SIZE), scaled(ANIMAL_SIZE)))
+        self.mask = get_mask("insect.png", (ANIMAL_SIZE, ANIMAL_SIZE))
+        self.rect = pygame.Rect(0, 0, ANIMAL_SIZE, ANIMAL_SIZE)
+        self.rect.midbottom = (random.randint(SCREEN_WIDTH, SCREEN_WIDTH + 400), SCREEN_HEIGHT)
         self.speed = random.randint(2, 4)
 
     def update(self):
@@ -96,18 +163,18 @@ class Animal(pygame.sprite.Sprite):
             self.rect.left = random.randint(SCREEN_WIDTH, SCREEN_WIDTH + 400)
 
     def draw_with_text(self, surface):
-        surface.blit(self.image, self.rect)
+        surface.blit(self.image, render_pos(self.rect.topleft))
         text = bold_font.render(str(self.equation), True, (255, 255, 255))
-        text_rect = text.get_rect(center=self.rect.center)
+        text_rect = text.get_rect(center=render_pos(self.rect.center))
         surface.blit(text, text_rect)
 
 # ----- HUD -----
 def draw_hud(screen, score, lives, question, high_score):
     text = font.render(f"Score: {score}   Lives: {lives}   High Score: {high_score}", True, (0, 0, 0))
-    screen.blit(text, (10, 10))
+    screen.blit(text, render_pos((10, 10)))
 
     question_text = question_font.render(question, True, (0, 0, 0))
-    question_text_rect = question_text.get_rect(center=(SCREEN_WIDTH // 2, 50))
+    question_text_rect = question_text.get_rect(center=render_pos((SCREEN_WIDTH // 2, 50)))
     screen.blit(question_text, question_text_rect)
 
 # ----- QUESTION GENERATORS -----
@@ -165,10 +232,21 @@ high_score = 50
 lives = 3
 show_congrats = False
 show_gameover = False
-congrats_timer = 0
+
+# ----- TIMED EVENTS -----
+scheduler = Scheduler()
+
+def hide_congrats():
+    global show_congrats
+    show_congrats = False
+
+def end_game():
+    global running
+    running = False
 
 def new_question():
     question_type = random.choice(["math", "chemical", "unemployed_addition"])
+    questions_served.labels(type=question_type).inc()
     if question_type == "math":
         return generate_math_question()
     elif question_type == "chemical":
@@ -180,37 +258,50 @@ question, animal_list = new_question()
 for a in animal_list:
     animals_group.add(a)
 
+tracer = LatencyTracer(os.environ.get("LATENCY_LABEL", "")) if LATENCY_TRACE else None
+capture = FrameCapture(CAPTURE, screen, FPS) if CAPTURE else None
+
 # ----- MAIN LOOP -----
 running = True
 while running:
-    screen.blit(background_img, (0, 0))
+    frame.blit(background_img, (0, 0))
 
-    for event in pygame.event.get():
+    events = pygame.event.get()
+    if tracer:
+        tracer.poll(events)
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.KEYDOWN and event.key == pygame.K_DOWN:
             player.descend()
+            if tracer:
+                tracer.consumed(event)
         elif event.type == pygame.KEYUP and event.key == pygame.K_DOWN:
             player.stop_descending()
+            if tracer:
+                tracer.consumed(event)
 
     if not show_gameover:
         player_group.update()
         animals_group.update()
 
         for animal in animals_group:
-            if player.rect.colliderect(animal.rect):
+            if collide(player, animal):
                 if animal.is_correct:
+                    hits.inc()
                     score += 10
                     if score > high_score and not show_congrats:
                         show_congrats = True
-                        congrats_timer = pygame.time.get_ticks()
+                        scheduler.call_later(3 * FPS, hide_congrats)
                         high_score = score
                     question, animal_list = new_question()
                 else:
+                    misses.inc()
+                    lives_lost.inc()
                     lives -= 1
                     if lives <= 0:
                         show_gameover = True
-                        gameover_timer = pygame.time.get_ticks()
+                        scheduler.call_later(3 * FPS, end_game)
                     else:
                         question, animal_list = new_question()
                 animals_group.empty()
@@ -218,29 +309,42 @@ while running:
                     animals_group.add(new_animal)
                 break
 
-    pygame.draw.line(screen, (139, 69, 19), (0, BRANCH_Y_POSITION), (SCREEN_WIDTH, BRANCH_Y_POSITION), 4)
+    scheduler.advance()
+
+    pygame.draw.line(frame, (139, 69, 19), render_pos((0, BRANCH_Y_POSITION)),
+                     render_pos((SCREEN_WIDTH, BRANCH_Y_POSITION)), scaled(4))
     for a in animals_group:
-        a.draw_with_text(screen)
-    player_group.draw(screen)
+        a.draw_with_text(frame)
+    player.draw(frame)
 
-    draw_hud(screen, score, lives, question, high_score)
+    draw_hud(frame, score, lives, question, high_score)
 
     # Show Congrats Image
     if show_congrats:
-        if pygame.time.get_ticks() - congrats_timer < 3000:
-            img_rect = congrats_img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-            screen.blit(congrats_img, img_rect)
-        else:
-            show_congrats = False
+        img_rect = congrats_img.get_rect(center=(RENDER_WIDTH // 2, RENDER_HEIGHT // 2))
+        frame.blit(congrats_img, img_rect)
 
     # Show Game Over
     if show_gameover:
-        img_rect = gameover_img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-        screen.blit(gameover_img, img_rect)
-        if pygame.time.get_ticks() - gameover_timer > 3000:
-            running = False
+        img_rect = gameover_img.get_rect(center=(RENDER_WIDTH // 2, RENDER_HEIGHT // 2))
+        frame.blit(gameover_img, img_rect)
 
+    if frame is not screen:
+        pygame.transform.scale(frame, (SCREEN_WIDTH, SCREEN_HEIGHT), screen)
     pygame.display.update()
-    clock.tick(60)
-
+    if tracer:
+        tracer.presented()
+    if capture:
+        capture.capture(screen)
+    frame_ms = clock.tick(FPS)
+    frames_total.inc()
+    frame_seconds.observe(frame_ms / 1000)
+    frame_work_seconds.observe(clock.get_rawtime() / 1000)
+    if frame_ms > 1.5 * FRAME_BUDGET_MS:
+        dropped_frames.inc(round(frame_ms / FRAME_BUDGET_MS) - 1)
+
+if tracer:
+    tracer.save(LATENCY_TRACE)
+if capture:
+    print(capture.close())
 pygame.quit()
@@ -0,0 +1,84 @@
+import copy
+import random
+
+from masks import masks_overlap
+from sim import SCREEN_WIDTH
+
+# ----- CONFIG -----
+MAX_DIVE_FRAMES = 240
+# How evaluate.py and sweep.py play unless told otherwise: about a quarter
+# of a second to react, give or take a few frames.
+SKILL_PARAMS = {
+    "REACTION_FRAMES": 15,
+    "TIMING_NOISE": 4,
+}
+
+# ----- AUTOPLAYER -----
+class Bot:
+    # Presses DOWN when a dive started now would hit the insect labelled with
+    # the right answer before any wrong one, and holds it until the player is
+    # back on the branch. Only insects already on screen are considered.
+    # lead is how many frames late its key presses take effect (input delay).
+    # reaction is how long it takes to press once it has decided, and noise
+    # how many frames either way the press may land without the bot knowing:
+    # it plans for the reaction time but not for the noise.
+    def __init__(self, game, player=None, lead=0, reaction=0, noise=0, rng=None):
+        self.game = game
+        self.player = player or game.player
+        self.lead = lead
+        self.reaction = reaction
+        self.noise = noise
+        self.rng = rng or random.Random()
+        self.holding = False
+        self.wait = 0
+        self.press_in = None
+
+    def visible_animals(self):
+        return [a for a in self.game.animals if a.rect.right > 0 and a.rect.left < SCREEN_WIDTH]
+
+    def dive_path(self, delay=0):
+        ghost = copy.copy(self.player)
+        ghost.rect = ghost.rect.copy()
+        path = []
+        for _ in range(delay):
+            ghost.update()
+            path.append((ghost.rect.copy(), ghost.mask))
+        ghost.descend()
+        for _ in range(MAX_DIVE_FRAMES):
+            ghost.update()
+            path.append((ghost.rect.copy(), ghost.mask))
+            if ghost.descend_speed == 0:
+                break
+        return path
+
+    def first_hit(self, path):
+        animals = self.visible_animals()
+        for t, (player_rect, player_mask) in enumerate(path, 1):
+            for animal in animals:
+                if masks_overlap(player_rect, player_mask, animal.rect.move(-animal.speed * t, 0), animal.mask):
+                    return animal
+        return None
+
+    # Returns (descend, release) for the next frame.
+    def act(self):
+        if self.holding:
+            if self.wait:
+                self.wait -= 1
+            elif self.player.descend_speed == 0:
+                self.holding = False
+                return False, True
+            return False, False
+        if self.press_in is None:
+            if self.game.show_gameover or not any(a.is_correct for a in self.visible_animals()):
+                return False, False
+            target = self.first_hit(self.dive_path(self.lead + self.reaction))
+            if target is None or not target.is_correct:
+                return False, False
+            self.press_in = max(0, self.reaction + self.rng.randint(-self.noise, self.noise))
+        if self.press_in:
+            self.press_in -= 1
+            return False, False
+        self.press_in = None
+        self.holding = True
+        self.wait = self.lead
+        return True, False
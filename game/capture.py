@@ -0,0 +1,182 @@
+import argparse
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+import pygame
+
+# ----- CONFIG -----
+RING_SLOTS = 8
+KEYFRAME_INTERVAL = 120
+REPORT_INTERVAL = 1.0  # seconds between "writer is behind" lines while frames are dropped
+MAGIC = b"CMCP"
+VERSION = 1
+RAW = 0
+DELTA = 1
+
+# magic, version, width, height, fps, compression
+HEADER = struct.Struct("<4sHHHHB")
+# frame number, seconds since capture start, keyframe, payload length
+FRAME = struct.Struct("<Id?I")
+
+# ----- CAPTURE -----
+class FrameCapture:
+    # The main loop only blits the presented frame into a free surface from
+    # a preallocated ring and hands its index to the writer thread, which
+    # converts, optionally compresses and writes it. When every slot is still
+    # waiting to be written, the frame is dropped and counted, never waited on.
+    # DELTA stores each frame XORed with the previous written one and zlib'd:
+    # the background never changes, so most bytes are zero.
+    def __init__(self, path, screen, fps=60, compress=True, slots=RING_SLOTS):
+        self.size = screen.get_size()
+        self.ring = [pygame.Surface(self.size, 0, screen) for _ in range(slots)]
+        self.numbers = [0] * slots
+        self.stamps = [0.0] * slots
+        self.free = queue.SimpleQueue()
+        self.ready = queue.SimpleQueue()
+        for i in range(slots):
+            self.free.put(i)
+
+        self.compression = DELTA if compress else RAW
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, *self.size, fps, self.compression))
+        self.start = time.perf_counter()
+        self.frames = 0
+        self.dropped = 0
+        self.written = 0
+        self.last_report = 0.0
+        self.thread = threading.Thread(target=self._write, name="frame-capture", daemon=True)
+        self.thread.start()
+
+    def capture(self, screen):
+        number = self.frames
+        self.frames += 1
+        try:
+            i = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            now = time.perf_counter()
+            if now - self.last_report >= REPORT_INTERVAL:
+                print(f"capture: writer is behind, dropped {self.dropped} of {self.frames} frames so far",
+                      file=sys.stderr)
+                self.last_report = now
+            return
+        self.ring[i].blit(screen, (0, 0))
+        self.numbers[i] = number
+        self.stamps[i] = time.perf_counter() - self.start
+        self.ready.put(i)
+
+    def _write(self):
+        previous = None
+        while True:
+            i = self.ready.get()
+            if i is None:
+                break
+            pixels = pygame.image.tostring(self.ring[i], "RGB")
+            number, stamp = self.numbers[i], self.stamps[i]
+            self.free.put(i)
+            keyframe = True
+            if self.compression == DELTA:
+                current = int.from_bytes(pixels, "little")
+                keyframe = previous is None or self.written % KEYFRAME_INTERVAL == 0
+                if not keyframe:
+                    pixels = (current ^ previous).to_bytes(len(pixels), "little")
+                pixels = zlib.compress(pixels, 1)
+                previous = current
+            self.file.write(FRAME.pack(number, stamp, keyframe, len(pixels)))
+            self.file.write(pixels)
+            self.written += 1
+
+    def close(self):
+        self.ready.put(None)
+        self.thread.join()
+        self.file.close()
+        return f"captured {self.written} of {self.frames} frames, dropped {self.dropped}"
+
+# ----- READING -----
+def read_frames(path):
+    with open(path, "rb") as f:
+        magic, version, width, height, fps, compression = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a frame capture")
+        yield width, height, fps
+        previous = None
+        while True:
+            head = f.read(FRAME.size)
+            if len(head) < FRAME.size:
+                break
+            number, stamp, keyframe, length = FRAME.unpack(head)
+            pixels = f.read(length)
+            if len(pixels) < length:
+                break
+            if compression == DELTA:
+                pixels = zlib.decompress(pixels)
+                current = int.from_bytes(pixels, "little")
+                if not keyframe:
+                    current ^= previous
+                    pixels = current.to_bytes(len(pixels), "little")
+                previous = current
+            yield number, stamp, pixels
+
+# ----- CONVERT -----
+# Output frame k shows what was on screen k / fps seconds into the session,
+# going by the capture stamps. Frames from a slow session, or gaps left by
+# dropped ones, are repeated; surplus frames from a fast one are skipped.
+def frames_at_fps(path):
+    frames = read_frames(path)
+    width, height, fps = next(frames)
+    def timed():
+        start, previous, k = None, None, 0
+        for _, stamp, pixels in frames:
+            if start is None:
+                start = stamp
+            while previous is not None and start + k / fps < stamp:
+                yield previous
+                k += 1
+            previous = pixels
+        if previous is not None:
+            yield previous
+    return width, height, fps, timed()
+
+def to_images(path, out_dir):
+    width, height, _, frames = frames_at_fps(path)
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for count, pixels in enumerate(frames, 1):
+        surface = pygame.image.frombuffer(pixels, (width, height), "RGB")
+        pygame.image.save(surface, os.path.join(out_dir, f"frame_{count:06d}.png"))
+    return count
+
+def to_video(path, out_file):
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise SystemExit("ffmpeg not found; convert to an image directory instead")
+    width, height, fps, frames = frames_at_fps(path)
+    proc = subprocess.Popen([ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                             "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                             "-pix_fmt", "yuv420p", out_file], stdin=subprocess.PIPE)
+    count = 0
+    for count, pixels in enumerate(frames, 1):
+        proc.stdin.write(pixels)
+    proc.stdin.close()
+    proc.wait()
+    return count
+
+# python capture.py session.cap frames/       -> PNG sequence
+# python capture.py session.cap session.mp4   -> video (needs ffmpeg)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a CAPTURE= frame stream into viewable files.")
+    parser.add_argument("capture")
+    parser.add_argument("output", help="directory for PNG frames, or a video file name (e.g. .mp4, .gif)")
+    args = parser.parse_args()
+    if os.path.splitext(args.output)[1]:
+        count = to_video(args.capture, args.output)
+    else:
+        count = to_images(args.capture, args.output)
+    print(f"wrote {count} frames to {args.output}")
@@ -0,0 +1,102 @@
+import argparse
+import os
+import random
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from bot import SKILL_PARAMS, Bot
+from sim import FPS, QUESTION_TYPES, Game
+
+# ----- CONFIG -----
+MAX_FRAMES = 60 * FPS  # one simulated minute per game
+GAMES_PER_TASK = 25
+
+# ----- ONE GAME -----
+# params may also hold the SKILL_PARAMS the bot plays with.
+def play(seed, params=None, question_types=None, max_frames=MAX_FRAMES):
+    result = {"seed": seed, "score": 0, "won": False, "frames": 0, "answers": [], "crash": None}
+    skill = {**SKILL_PARAMS, **(params or {})}
+    game = None
+    try:
+        game = Game(seed, params, question_types)
+        bot = Bot(game, reaction=skill["REACTION_FRAMES"], noise=skill["TIMING_NOISE"], rng=random.Random(seed))
+        while not game.over and game.frame < max_frames:
+            question_type, served = game.question_type, game.question_frame
+            outcome = game.step(*bot.act())
+            if outcome:
+                result["answers"].append((question_type, outcome, game.frame - served))
+    except Exception:
+        result["crash"] = (game.question_type if game else None, traceback.format_exc(limit=3))
+    if game:
+        result.update(score=game.score, won=game.won, frames=game.frame)
+    return result
+
+def play_many(task):
+    seeds, params, question_types, max_frames = task
+    return [play(seed, params, question_types, max_frames) for seed in seeds]
+
+def run_games(seeds, params=None, question_types=None, max_frames=MAX_FRAMES, workers=None, executor=None):
+    seeds = list(seeds)
+    tasks = [(seeds[i:i + GAMES_PER_TASK], params, question_types, max_frames)
+             for i in range(0, len(seeds), GAMES_PER_TASK)]
+    if executor is not None:
+        return [r for chunk in executor.map(play_many, tasks) for r in chunk]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [r for chunk in pool.map(play_many, tasks) for r in chunk]
+
+# ----- REPORT -----
+def summarize(results):
+    games = len(results)
+    answers = [a for r in results for a in r["answers"]]
+    correct = [a for a in answers if a[1] == "correct"]
+    return {
+        "games": games,
+        "win_rate": sum(r["won"] for r in results) / games if games else 0.0,
+        "avg_score": sum(r["score"] for r in results) / games if games else 0.0,
+        "accuracy": len(correct) / len(answers) if answers else 0.0,
+        "time_to_answer": sum(a[2] for a in correct) / len(correct) / FPS if correct else float("nan"),
+        "crashes": sum(1 for r in results if r["crash"]),
+    }
+
+def format_table(rows):
+    lines = [f"{'questions':<22}{'games':>7}{'win rate':>10}{'avg score':>11}{'accuracy':>10}{'answer s':>10}{'crashes':>9}"]
+    for name, s in rows:
+        lines.append(f"{name:<22}{s['games']:>7}{s['win_rate']:>10.1%}{s['avg_score']:>11.1f}"
+                     f"{s['accuracy']:>10.1%}{s['time_to_answer']:>10.2f}{s['crashes']:>9}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run seeded headless games with the autoplayer.")
+    parser.add_argument("--games", type=int, default=1000, help="games per question type")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--types", nargs="+", choices=list(QUESTION_TYPES), default=list(QUESTION_TYPES))
+    parser.add_argument("--reaction", type=int, default=SKILL_PARAMS["REACTION_FRAMES"],
+                        help="frames between the bot deciding to dive and pressing DOWN")
+    parser.add_argument("--noise", type=int, default=SKILL_PARAMS["TIMING_NOISE"],
+                        help="up to this many frames early or late on each press (0 = perfect timing)")
+    args = parser.parse_args()
+    params = {"REACTION_FRAMES": args.reaction, "TIMING_NOISE": args.noise}
+
+    start = time.perf_counter()
+    seeds = range(args.seed, args.seed + args.games)
+    rows = []
+    crashes = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for question_type in args.types:
+            results = run_games(seeds, params, [question_type], args.max_frames, executor=pool)
+            rows.append((question_type, summarize(results)))
+            crashes += [r for r in results if r["crash"]]
+        results = run_games(seeds, params, args.types, args.max_frames, executor=pool)
+        rows.append(("mixed", summarize(results)))
+        crashes += [r for r in results if r["crash"]]
+
+    print(format_table(rows))
+    games = args.games * (len(args.types) + 1)
+    print(f"\n{games} games in {time.perf_counter() - start:.1f}s")
+    for r in crashes[:5]:
+        print(f"\nseed {r['seed']} crashed during a {r['crash'][0]} question:\n{r['crash'][1]}")
@@ -0,0 +1,138 @@
+import json
+import sys
+import time
+from bisect import bisect_left
+
+import pygame
+
+# ----- CONFIG -----
+# Upper bucket bounds in milliseconds; the last bucket catches everything above
+LATENCY_BUCKETS_MS = [1, 2, 4, 8, 12, 16, 20, 25, 33, 50, 67, 100, 150, 250, 500]
+
+# ----- HISTOGRAM -----
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def to_dict(self):
+        return {"bounds": self.bounds, "counts": self.counts, "count": self.count, "sum": self.sum}
+
+    @classmethod
+    def from_dict(cls, data):
+        h = cls(data["bounds"])
+        h.counts = list(data["counts"])
+        h.count = data["count"]
+        h.sum = data["sum"]
+        return h
+
+# ----- TRACER -----
+class LatencyTracer:
+    # Stages of an input event:
+    #   arrived   - pulled off the SDL queue by pygame.event.get()
+    #   consumed  - handed to Player.descend / Player.stop_descending
+    #   presented - first pygame.display.update() after it was consumed
+    # pygame does not expose SDL's own event timestamps, so "arrived" is the
+    # poll time; queue_wait is bounded by the gap since the previous poll.
+
+    def __init__(self, label=""):
+        self.label = label
+        self.histograms = {}
+        self.frames = 0
+        self.last_poll = None
+        self.arrivals = {}
+        self.waiting = []
+
+    def _hist(self, kind, stage):
+        key = (kind, stage)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(LATENCY_BUCKETS_MS)
+        return self.histograms[key]
+
+    def poll(self, events):
+        now = time.perf_counter()
+        for event in events:
+            self.arrivals[id(event)] = now
+            if self.last_poll is not None:
+                self._hist(event_kind(event), "queue_wait").observe((now - self.last_poll) * 1000)
+        self.last_poll = now
+        return events
+
+    def consumed(self, event):
+        now = time.perf_counter()
+        arrived = self.arrivals.pop(id(event), now)
+        kind = event_kind(event)
+        self._hist(kind, "arrive_to_consume").observe((now - arrived) * 1000)
+        self.waiting.append((kind, arrived, now))
+
+    def presented(self):
+        now = time.perf_counter()
+        self.frames += 1
+        for kind, arrived, consumed in self.waiting:
+            self._hist(kind, "consume_to_present").observe((now - consumed) * 1000)
+            self._hist(kind, "arrive_to_present").observe((now - arrived) * 1000)
+        self.waiting.clear()
+        self.arrivals.clear()
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "frames": self.frames,
+            "histograms": {f"{kind}/{stage}": h.to_dict() for (kind, stage), h in self.histograms.items()},
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+def event_kind(event):
+    return pygame.event.event_name(event.type)
+
+# ----- REPORT -----
+def format_histogram(name, h, width=40, unit="ms"):
+    lines = [f"{name}: n={h.count} mean={h.mean():.2f}{unit} p50<={h.percentile(50)}{unit} "
+             f"p95<={h.percentile(95)}{unit} p99<={h.percentile(99)}{unit}"]
+    peak = max(h.counts) or 1
+    lower = 0
+    for i, c in enumerate(h.counts):
+        upper = h.bounds[i] if i < len(h.bounds) else None
+        label = f"{lower:>4}-{upper:<4}{unit}" if upper is not None else f"{lower:>4}+     {unit}"
+        lines.append(f"  {label} {c:>6} {'#' * (c * width // peak)}")
+        lower = upper
+    return "\n".join(lines)
+
+def print_report(data):
+    print(f"== {data['label'] or 'run'} ({data['frames']} frames) ==")
+    for name in sorted(data["histograms"]):
+        print(format_histogram(name, Histogram.from_dict(data["histograms"][name])))
+
+# Compare pacing strategies: python latency.py vsync.json tick60.json ...
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python latency.py TRACE.json [TRACE.json ...]")
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        with open(path) as f:
+            print_report(json.load(f))
+        print()
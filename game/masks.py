@@ -0,0 +1,29 @@
+import os
+
+import pygame
+
+# ----- CONFIG -----
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ----- MASK CACHE -----
+# One mask per (image, size), shared by every sprite drawn with that image.
+# Masks are built from the unconverted image, so this works without a display.
+_masks = {}
+
+def get_mask(name, size):
+    key = (name, size)
+    mask = _masks.get(key)
+    if mask is None:
+        image = pygame.image.load(os.path.join(ASSET_DIR, name))
+        mask = _masks[key] = pygame.mask.from_surface(pygame.transform.scale(image, size))
+    return mask
+
+# ----- COLLISION -----
+def masks_overlap(rect_a, mask_a, rect_b, mask_b):
+    # The rect test rules out almost every pair; pixels are compared only on a rect hit
+    if not rect_a.colliderect(rect_b):
+        return False
+    return mask_a.overlap(mask_b, (rect_b.x - rect_a.x, rect_b.y - rect_a.y)) is not None
+
+def collide(a, b):
+    return masks_overlap(a.rect, a.mask, b.rect, b.mask)
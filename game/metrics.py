@@ -0,0 +1,149 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from latency import Histogram as Buckets
+
+# Counters, gauges and histograms in Prometheus text format. The game loop
+# is the only writer: recording is a plain attribute update (plus a bisect
+# for histograms) with no locks. The HTTP thread only reads, so a scrape
+# may see a histogram mid-update, which Prometheus tolerates.
+
+# ----- TEXT FORMAT -----
+# Label values escape backslash, double quote and newline; HELP text only
+# backslash and newline.
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+# ----- METRICS -----
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        if not self.labelnames:
+            self.children[()] = self.new_child()
+
+    def labels(self, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self.children.get(key)
+        if child is None:
+            child = self.children[key] = self.new_child()
+        return child
+
+    def label_text(self, key, extra=""):
+        pairs = [f'{n}="{escape_label(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self):
+        lines = [f"# HELP {self.name} {escape_help(self.help)}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self.children.items()):
+            lines += self.render_child(key, child)
+        return lines
+
+class Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+class Counter(Metric):
+    kind = "counter"
+
+    def new_child(self):
+        return Value()
+
+    def inc(self, amount=1):
+        self.children[()].value += amount
+
+    def render_child(self, key, child):
+        return [f"{self.name}{self.label_text(key)} {child.value}"]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value):
+        self.children[()].value = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, bounds, labelnames=()):
+        self.bounds = bounds
+        super().__init__(name, help, labelnames)
+
+    def new_child(self):
+        return Buckets(self.bounds)
+
+    def observe(self, value):
+        self.children[()].observe(value)
+
+    def render_child(self, key, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(child.bounds + ["+Inf"], child.counts):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{self.label_text(key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self.label_text(key)} {child.sum}")
+        lines.append(f"{self.name}_count{self.label_text(key)} {child.count}")
+        return lines
+
+# ----- REGISTRY -----
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, bounds, labelnames=()):
+        return self.register(Histogram(name, help, bounds, labelnames))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+# ----- HTTP -----
+def serve(registry, port, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,336 @@
+import argparse
+import os
+import socket
+import struct
+import sys
+import time
+import zlib
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import snapshot
+from bot import Bot
+from latency import Histogram, format_histogram
+from netproxy import parse_addr
+from sim import FPS, GAMEOVER_FRAMES, SCREEN_HEIGHT, SCREEN_WIDTH, VersusGame
+
+# ----- CONFIG -----
+DESCEND = 1
+RELEASE = 2
+MAX_ROLLBACK = 12      # frames we may run ahead of the last confirmed remote input
+INPUT_HISTORY = 64     # unacknowledged local inputs resent in every packet
+HELLO_INTERVAL = 0.1
+LINGER_SECONDS = 1.0
+DEPTH_BUCKETS = [1, 2, 3, 4, 6, 8, 12]
+RESIM_BUCKETS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8]
+
+# ----- PROTOCOL -----
+# first frame, number of inputs, highest remote frame we have confirmed;
+# followed by one input byte per frame.
+PACKET = struct.Struct("<III")
+
+def encode_packet(first, inputs, ack):
+    return PACKET.pack(first, len(inputs), ack) + bytes(inputs)
+
+# Returns None for anything too short to be one of ours
+def decode_packet(data):
+    if len(data) < PACKET.size:
+        return None
+    first, count, ack = PACKET.unpack_from(data)
+    if len(data) < PACKET.size + count:
+        return None
+    return first, data[PACKET.size:PACKET.size + count], ack
+
+def to_keys(bits):
+    return bool(bits & DESCEND), bool(bits & RELEASE)
+
+def to_bits(descend, release):
+    return (DESCEND if descend else 0) | (RELEASE if release else 0)
+
+# ----- ROLLBACK SESSION -----
+class RollbackSession:
+    # Runs the simulation without waiting on the network. Remote input for
+    # a frame that hasn't arrived yet is predicted as "no key event" (DOWN
+    # is edge triggered, so repeating the last input would be wrong). When
+    # the real input arrives and differs, the game is restored to the
+    # snapshot before that frame and re-simulated up to the present.
+    def __init__(self, game, me, sock, peer_addr, delay=0):
+        self.game = game
+        self.me = me
+        self.sock = sock
+        self.peer_addr = peer_addr
+        self.delay = delay
+        self.local = {}
+        self.remote = {}
+        self.predicted = {}
+        self.remote_confirmed = 0
+        self.peer_ack = 0
+        self.pending_bits = 0
+        self.rollback_from = None
+
+        self.slots = MAX_ROLLBACK + 2
+        self.snapshots = snapshot.new_buffer(self.slots, snapshot.VERSUS_SNAPSHOT_SIZE)
+        self.save()
+
+        self.frames = 0
+        self.rejected = 0
+        self.stalls = 0
+        self.rollbacks = 0
+        self.resim_frames = 0
+        self.resim_seconds = 0.0
+        self.depth = Histogram(DEPTH_BUCKETS)
+        self.resim_ms = Histogram(RESIM_BUCKETS_MS)
+
+    def save(self):
+        offset = (self.game.frame % self.slots) * snapshot.VERSUS_SNAPSHOT_SIZE
+        snapshot.save_versus(self.game, self.snapshots, offset)
+
+    def load(self, frame):
+        offset = (frame % self.slots) * snapshot.VERSUS_SNAPSHOT_SIZE
+        snapshot.restore_versus(self.game, self.snapshots, offset)
+
+    # ----- network -----
+    def send(self):
+        first = self.peer_ack + 1
+        last = min(max(self.local, default=0), first + INPUT_HISTORY - 1)
+        inputs = [self.local.get(f, 0) for f in range(first, last + 1)]
+        self.sock.sendto(encode_packet(first, inputs, self.remote_confirmed), self.peer_addr)
+
+    def receive(self):
+        got = False
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                break
+            # Stray datagrams on the port must neither crash nor steer the match
+            packet = decode_packet(data) if addr == self.peer_addr else None
+            if packet is None:
+                self.rejected += 1
+                continue
+            got = True
+            first, inputs, ack = packet
+            self.peer_ack = max(self.peer_ack, ack)
+            for frame, bits in enumerate(inputs, first):
+                if frame <= self.remote_confirmed or frame in self.remote:
+                    continue
+                self.remote[frame] = bits
+                if frame in self.predicted and self.predicted[frame] != bits:
+                    if self.rollback_from is None or frame < self.rollback_from:
+                        self.rollback_from = frame
+            while self.remote_confirmed + 1 in self.remote:
+                self.remote_confirmed += 1
+                self.predicted.pop(self.remote_confirmed, None)
+        return got
+
+    # Inputs older than the rollback window are never read again; local ones
+    # are also kept until the peer has acknowledged them.
+    def prune(self):
+        horizon = self.game.frame - self.slots
+        self.remote = {f: b for f, b in self.remote.items() if f > horizon}
+        self.local = {f: b for f, b in self.local.items() if f > min(horizon, self.peer_ack)}
+
+    # ----- simulation -----
+    def simulate(self):
+        frame = self.game.frame + 1
+        remote = self.remote.get(frame)
+        if remote is None:
+            remote = 0
+            self.predicted[frame] = remote
+        inputs = [None, None]
+        inputs[self.me] = to_keys(self.local.get(frame, 0))
+        inputs[1 - self.me] = to_keys(remote)
+        self.game.step_all(inputs)
+        self.save()
+
+    def rollback(self):
+        frame, self.rollback_from = self.rollback_from, None
+        if frame > self.game.frame:
+            return
+        start = time.perf_counter()
+        present = self.game.frame
+        self.load(frame - 1)
+        while self.game.frame < present:
+            self.simulate()
+        elapsed = time.perf_counter() - start
+        depth = present - frame + 1
+        self.rollbacks += 1
+        self.resim_frames += depth
+        self.resim_seconds += elapsed
+        self.depth.observe(depth)
+        self.resim_ms.observe(elapsed * 1000)
+
+    def tick(self, bits=0, advance=True):
+        self.receive()
+        if self.rollback_from is not None:
+            self.rollback()
+        self.pending_bits |= bits
+        if not advance or self.game.frame - self.remote_confirmed >= MAX_ROLLBACK:
+            if advance:
+                self.stalls += 1
+            self.send()
+            return False
+        self.local[self.game.frame + 1 + self.delay] = self.pending_bits
+        self.pending_bits = 0
+        self.send()
+        self.simulate()
+        self.frames += 1
+        self.prune()
+        return True
+
+    def report(self):
+        per_frame_ms = self.resim_seconds * 1000 / self.frames if self.frames else 0.0
+        lines = [
+            f"frames: {self.frames}  stalls: {self.stalls}  rollbacks: {self.rollbacks} "
+            f"({self.rollbacks / max(self.frames, 1):.1%} of frames)  rejected packets: {self.rejected}",
+            f"re-simulated frames: {self.resim_frames}  re-simulation cost: {per_frame_ms:.3f} ms per frame",
+            format_histogram("rollback depth", self.depth, unit="f"),
+            format_histogram("rollback cost", self.resim_ms),
+        ]
+        return "\n".join(lines)
+
+# ----- CONNECTION -----
+def open_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+def wait_for_peer(session, timeout):
+    deadline = time.perf_counter() + timeout
+    while not session.receive():
+        if time.perf_counter() > deadline:
+            raise SystemExit("no answer from peer")
+        session.send()
+        time.sleep(HELLO_INTERVAL)
+    session.send()
+
+# ----- WINDOW -----
+# Both players are simulated at the same spot (see sim.PLAYER_ANCHORS);
+# player 0's side is drawn mirrored so each appears to have their own lane.
+def on_side(rect, side):
+    return rect.move(SCREEN_WIDTH - rect.right - rect.left, 0) if side == 0 else rect
+
+# Sprites are (mirrored, as is) pairs indexed by side
+def load_sprite(path, size):
+    image = pygame.transform.scale(pygame.image.load(path).convert_alpha(), size)
+    return pygame.transform.flip(image, True, False), image
+
+def load_images(params):
+    player_size = (params["PLAYER_SIZE"], params["PLAYER_SIZE"])
+    animal_size = (params["ANIMAL_SIZE"], params["ANIMAL_SIZE"])
+    return {
+        "bg": pygame.transform.scale(pygame.image.load("bg.png").convert(), (SCREEN_WIDTH, SCREEN_HEIGHT)),
+        "swing": load_sprite("normal.png", player_size),
+        "descend": load_sprite("open.png", player_size),
+        "insect": load_sprite("insect.png", animal_size),
+    }
+
+def draw(screen, images, fonts, game, me, session):
+    font, bold_font, question_font = fonts
+    screen.blit(images["bg"], (0, 0))
+    pygame.draw.line(screen, (139, 69, 19), (0, game.params["BRANCH_Y_POSITION"]),
+                     (SCREEN_WIDTH, game.params["BRANCH_Y_POSITION"]), 4)
+    for side in (0, 1):
+        for animal in game.animals:
+            rect = on_side(animal.rect, side)
+            screen.blit(images["insect"][side], rect)
+            text = bold_font.render(str(animal.equation), True, (255, 255, 255))
+            screen.blit(text, text.get_rect(center=rect.center))
+    for i, player in enumerate(game.players):
+        image = (images["swing"] if player.descend_speed == 0 else images["descend"])[i]
+        rect = on_side(player.rect, i)
+        screen.blit(image, image.get_rect(center=rect.center))
+        label = font.render("You" if i == me else "Them", True, (0, 0, 0))
+        screen.blit(label, label.get_rect(midbottom=rect.midtop))
+
+    them = 1 - me
+    hud = (f"You: {game.scores[me]} ({game.lives[me]} lives)   Them: {game.scores[them]} "
+           f"({game.lives[them]} lives)   Rollbacks: {session.rollbacks}")
+    screen.blit(font.render(hud, True, (0, 0, 0)), (10, 10))
+    question = question_font.render(game.question, True, (0, 0, 0))
+    screen.blit(question, question.get_rect(center=(SCREEN_WIDTH // 2, 50)))
+    if game.show_gameover:
+        result = "You win!" if game.winner == me else "You lose!"
+        text = bold_font.render(result, True, (255, 255, 255))
+        screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+
+# ----- MAIN -----
+def main():
+    parser = argparse.ArgumentParser(description="Two-player race over UDP with rollback.")
+    parser.add_argument("player", type=int, choices=[0, 1], help="which side this machine plays")
+    parser.add_argument("--host", default="0.0.0.0", help="local address to bind")
+    parser.add_argument("--port", type=int, required=True, help="local UDP port")
+    parser.add_argument("--peer", required=True, help="HOST:PORT of the other player (or the proxy)")
+    parser.add_argument("--seed", type=int, default=0, help="must match on both machines")
+    parser.add_argument("--delay", type=int, default=0, help="frames of local input delay")
+    parser.add_argument("--headless", action="store_true", help="no window; the autoplayer presses DOWN")
+    parser.add_argument("--frames", type=int, default=0, help="stop after this many frames (0 = until game over)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    game = VersusGame(args.seed)
+    sock = open_socket(args.host, args.port)
+    session = RollbackSession(game, args.player, sock, parse_addr(args.peer), args.delay)
+
+    pygame.init()
+    clock = pygame.time.Clock()
+    screen = None
+    if args.headless:
+        bot = Bot(game, game.players[args.player], lead=args.delay)
+    else:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption(f"Swinging Branches - Player {args.player + 1}")
+        images = load_images(game.params)
+        fonts = (pygame.font.SysFont("arial", 24), pygame.font.SysFont("arial", 24, bold=True),
+                 pygame.font.SysFont("arial", 18))
+
+    print(f"player {args.player}: waiting for peer at {args.peer}")
+    wait_for_peer(session, args.timeout)
+
+    end_frame = args.frames or None
+    running = True
+    while running:
+        bits = 0
+        if args.headless:
+            bits = to_bits(*bot.act())
+        else:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_DOWN:
+                    bits |= DESCEND
+                elif event.type == pygame.KEYUP and event.key == pygame.K_DOWN:
+                    bits |= RELEASE
+
+        # Only end on a confirmed game over, so both sides stop on the same frame
+        if end_frame is None and game.show_gameover and game.gameover_timer <= session.remote_confirmed:
+            end_frame = game.gameover_timer + GAMEOVER_FRAMES + 1
+        advance = end_frame is None or game.frame < end_frame
+        session.tick(bits, advance)
+        if not advance and session.remote_confirmed >= end_frame and session.peer_ack >= end_frame:
+            running = False
+
+        if screen:
+            draw(screen, images, fonts, game, args.player, session)
+            pygame.display.update()
+        clock.tick(FPS)
+
+    # Keep acknowledging for a moment so the peer can finish too
+    linger = time.perf_counter() + LINGER_SECONDS
+    while time.perf_counter() < linger:
+        session.tick(advance=False)
+        time.sleep(1 / FPS)
+
+    print(session.report())
+    if end_frame and game.frame > end_frame:
+        session.load(end_frame)
+    confirmed = game.frame <= session.remote_confirmed
+    print(f"final frame {game.frame} state crc32 {zlib.crc32(snapshot.save_versus(game)):08x}"
+          f"{'' if confirmed else ' (unconfirmed)'}  scores {game.scores}  lives {game.lives}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    sys.exit(main())
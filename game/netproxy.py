@@ -0,0 +1,75 @@
+import argparse
+import heapq
+import random
+import select
+import socket
+import time
+
+# Sits between the two netplay.py peers on loopback and delays, jitters,
+# reorders and drops their UDP packets:
+#
+#   player 0 --> proxy:LISTEN_A --(sent from LISTEN_B)--> player 1
+#   player 1 --> proxy:LISTEN_B --(sent from LISTEN_A)--> player 0
+#
+#   python netproxy.py 7100 7101 --a 127.0.0.1:7001 --b 127.0.0.1:7002 --latency 60 --jitter 20 --loss 0.02
+#   python netplay.py 0 --port 7001 --peer 127.0.0.1:7100
+#   python netplay.py 1 --port 7002 --peer 127.0.0.1:7101
+
+# ----- CONFIG -----
+MAX_WAIT = 0.05
+
+# Names are resolved up front so the result compares equal to recvfrom addresses
+def parse_addr(text):
+    host, _, port = text.rpartition(":")
+    return socket.gethostbyname(host or "127.0.0.1"), int(port)
+
+def run_proxy(listen_a, listen_b, addr_a, addr_b, latency_ms, jitter_ms, loss, seed=None):
+    rng = random.Random(seed)
+    sock_a = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock_a.bind(("127.0.0.1", listen_a))
+    sock_b = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock_b.bind(("127.0.0.1", listen_b))
+    # packets from A leave through sock_b so B's replies come back to listen_b
+    routes = {sock_a: (sock_b, addr_b), sock_b: (sock_a, addr_a)}
+
+    queue = []
+    seq = 0
+    stats = {"forwarded": 0, "dropped": 0}
+    last_report = time.perf_counter()
+    while True:
+        now = time.perf_counter()
+        timeout = min(MAX_WAIT, max(0.0, queue[0][0] - now)) if queue else MAX_WAIT
+        readable, _, _ = select.select([sock_a, sock_b], [], [], timeout)
+        now = time.perf_counter()
+        for sock in readable:
+            data = sock.recv(65536)
+            if rng.random() < loss:
+                stats["dropped"] += 1
+                continue
+            delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+            seq += 1
+            heapq.heappush(queue, (now + delay, seq, routes[sock], data))
+        while queue and queue[0][0] <= now:
+            _, _, (out, addr), data = heapq.heappop(queue)
+            out.sendto(data, addr)
+            stats["forwarded"] += 1
+        if now - last_report > 5:
+            print(f"forwarded {stats['forwarded']}  dropped {stats['dropped']}  in flight {len(queue)}")
+            last_report = now
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency/jitter/loss injecting UDP relay for netplay.py.")
+    parser.add_argument("listen_a", type=int, help="port player 0 sends to")
+    parser.add_argument("listen_b", type=int, help="port player 1 sends to")
+    parser.add_argument("--a", required=True, help="HOST:PORT of player 0")
+    parser.add_argument("--b", required=True, help="HOST:PORT of player 1")
+    parser.add_argument("--latency", type=float, default=50.0, help="one-way delay in ms")
+    parser.add_argument("--jitter", type=float, default=10.0, help="+/- ms added to each packet")
+    parser.add_argument("--loss", type=float, default=0.0, help="drop probability per packet")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    try:
+        run_proxy(args.listen_a, args.listen_b, parse_addr(args.a), parse_addr(args.b),
+                  args.latency, args.jitter, args.loss, args.seed)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,119 @@
+import heapq
+
+# ----- CONFIG -----
+COMPACT_MIN = 64  # heaps smaller than this are never compacted
+
+# ----- TIMER -----
+class Timer:
+    __slots__ = ("when", "seq", "callback", "args", "interval")
+
+    def __init__(self, when, seq, callback, args, interval=None):
+        self.when = when
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+
+    def __lt__(self, other):
+        return (self.when, self.seq) < (other.when, other.seq)
+
+    @property
+    def cancelled(self):
+        return self.callback is None
+
+# ----- SCHEDULER -----
+class Scheduler:
+    # Time is counted in simulation frames, not wall-clock milliseconds, so a
+    # replay with the same inputs fires the same callbacks on the same frames.
+    # Timers due on the same frame run in the order they were scheduled.
+    def __init__(self, now=0):
+        self.now = now
+        self._heap = []
+        self._seq = 0
+        self._live = 0
+
+    def __len__(self):
+        return self._live
+
+    def call_at(self, when, callback, *args):
+        self._seq += 1
+        timer = Timer(when, self._seq, callback, args)
+        heapq.heappush(self._heap, timer)
+        self._live += 1
+        return timer
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(self.now + delay, callback, *args)
+
+    def call_every(self, interval, callback, *args):
+        timer = self.call_later(interval, callback, *args)
+        timer.interval = interval
+        return timer
+
+    def cancel(self, timer):
+        # Lazy removal: the entry is dropped when it reaches the top of the
+        # heap, or sooner if cancelled entries come to outnumber live ones.
+        # Cancelling a fired one-shot or an already cancelled timer is a no-op.
+        if timer.cancelled:
+            return
+        timer.callback = None
+        timer.args = ()
+        self._live -= 1
+        heap = self._heap
+        if len(heap) >= COMPACT_MIN and self._live < len(heap) // 2:
+            heap[:] = [t for t in heap if not t.cancelled]
+            heapq.heapify(heap)
+
+    def advance(self, frames=1):
+        self.now += frames
+        heap = self._heap
+        while heap and heap[0].when <= self.now:
+            timer = heapq.heappop(heap)
+            if timer.cancelled:
+                continue
+            callback, args = timer.callback, timer.args
+            if timer.interval:
+                self._seq += 1
+                timer.when += timer.interval
+                timer.seq = self._seq
+                heapq.heappush(heap, timer)
+            else:
+                timer.callback = None
+                timer.args = ()
+                self._live -= 1
+            callback(*args)
+
+# python scheduler.py: ordering, repeats, cancelling and the live count
+if __name__ == "__main__":
+    fired = []
+    scheduler = Scheduler()
+
+    # Same-frame timers run in scheduling order, whatever order they were added in
+    scheduler.call_at(5, fired.append, "b1")
+    scheduler.call_at(2, fired.append, "a")
+    scheduler.call_at(5, fired.append, "b2")
+    every = scheduler.call_every(2, fired.append, "tick")
+    doomed = scheduler.call_at(7, fired.append, "never")
+
+    # Cancelling from inside a callback. The tick re-armed for frame 6 was
+    # scheduled after stop, so stop runs first and the tick never fires.
+    def stop():
+        fired.append("stop")
+        scheduler.cancel(every)
+        scheduler.cancel(doomed)
+        scheduler.cancel(doomed)
+    scheduler.call_at(6, stop)
+    assert len(scheduler) == 6
+
+    scheduler.advance(10)
+    assert fired == ["a", "tick", "tick", "b1", "b2", "stop"], fired
+    assert len(scheduler) == 0, len(scheduler)
+
+    # Cancelled entries don't pile up in the heap
+    timers = [scheduler.call_later(1000 + i, fired.append, i) for i in range(1000)]
+    for timer in timers[:900]:
+        scheduler.cancel(timer)
+    assert len(scheduler) == 100 and len(scheduler._heap) < 300, (len(scheduler), len(scheduler._heap))
+    scheduler.cancel(timers[0])
+    assert len(scheduler) == 100
+    print("scheduler checks passed")
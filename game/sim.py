@@ -0,0 +1,331 @@
+import math
+import os
+import random
+
+import pygame
+
+from masks import get_mask, masks_overlap
+
+# Headless copy of the CatchMeIfYouCan.py rules. Nothing here touches the
+# display or reads the clock, so games run uncapped and are fully
+# determined by the seed and the per-frame inputs. Collision masks are
+# built from the sprite PNGs (masks.get_mask), so the sim and its worker
+# processes need the image files next to masks.py.
+
+# ----- CONFIG -----
+SIM_VERSION = 4  # bump when a change alters results for the same seed
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+FPS = 60
+HIGH_SCORE = 50
+LIVES = 3
+CONGRATS_FRAMES = 3 * FPS
+GAMEOVER_FRAMES = 3 * FPS
+TARGET_SCORE = 100
+# Both versus players hang at the same distance from where the insects
+# spawn, so neither reaches them first. netplay.py draws player 0 and a copy
+# of the insects mirrored about the middle of the screen.
+PLAYER_ANCHORS = (500, 500)
+
+DEFAULT_PARAMS = {
+    "BRANCH_Y_POSITION": 100,
+    "SWING_RADIUS": 100,
+    "SWING_SPEED": 0.00,
+    "PLAYER_SIZE": 100,
+    "GRAVITY": 0.02,
+    "MAX_DESCEND_SPEED": 0.5,
+    "ANIMAL_SIZE": 60,
+    "INSECT_SPEED_MIN": 2,
+    "INSECT_SPEED_MAX": 4,
+}
+
+# ----- RANDOM -----
+MASK64 = (1 << 64) - 1
+
+class GameRandom(random.Random):
+    # xorshift64* behind the random.Random API. Its whole state is one
+    # integer, so snapshots of it are a single word instead of the 625 words
+    # of Mersenne Twister state.
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = int.from_bytes(os.urandom(8), "little")
+        elif not isinstance(a, int):
+            a = int.from_bytes(str(a).encode(), "little")
+        self.state = ((a * 0x9E3779B97F4A7C15) + 0x632BE59BD9B4E019) & MASK64 or 1
+        self.gauss_next = None
+
+    def next64(self):
+        x = self.state
+        x ^= x >> 12
+        x ^= (x << 25) & MASK64
+        x ^= x >> 27
+        self.state = x
+        return (x * 0x2545F4914F6CDD1D) & MASK64
+
+    def getrandbits(self, k):
+        bits = 0
+        for shift in range(0, k, 64):
+            bits |= self.next64() << shift
+        return bits & ((1 << k) - 1)
+
+    def random(self):
+        return (self.next64() >> 11) * (1.0 / (1 << 53))
+
+    def getstate(self):
+        return self.state, self.gauss_next
+
+    def setstate(self, state):
+        self.state, self.gauss_next = state
+
+# ----- PLAYER -----
+class Player:
+    def __init__(self, params, anchor_x=400):
+        self.params = params
+        self.anchor_x = anchor_x
+        self.angle = math.pi / 2
+        self.swing_speed = params["SWING_SPEED"]
+        self.descend_speed = 0
+        self.rect = pygame.Rect(0, 0, params["PLAYER_SIZE"], params["PLAYER_SIZE"])
+        self.rect.center = (anchor_x, params["BRANCH_Y_POSITION"])
+        size = (params["PLAYER_SIZE"], params["PLAYER_SIZE"])
+        self.swing_mask = get_mask("normal.png", size)
+        self.descend_mask = get_mask("open.png", size)
+        self.mask = self.swing_mask
+
+    def update_position(self):
+        cx = self.anchor_x
+        cy = self.params["BRANCH_Y_POSITION"] if self.descend_speed == 0 else self.rect.centery
+        self.rect.centerx = cx + self.params["SWING_RADIUS"] * math.cos(self.angle)
+        self.rect.centery = cy + self.params["SWING_RADIUS"] * math.sin(self.angle)
+
+    def update(self):
+        ground = SCREEN_HEIGHT - 40
+        if self.descend_speed == 0:
+            self.angle += self.swing_speed
+            if self.angle > 1.5 or self.angle < 0.5:
+                self.swing_speed = -self.swing_speed
+        else:
+            self.rect.centery += self.descend_speed
+            if self.rect.centery >= ground:
+                self.rect.centery = ground
+                self.descend_speed = 0
+        self.mask = self.swing_mask if self.descend_speed == 0 else self.descend_mask
+        self.update_position()
+
+    def descend(self):
+        if self.rect.centery < SCREEN_HEIGHT - 40:
+            if self.descend_speed < self.params["MAX_DESCEND_SPEED"]:
+                self.descend_speed += self.params["GRAVITY"]
+
+    def stop_descending(self):
+        self.descend_speed = 0
+
+# ----- ANIMAL -----
+class Animal:
+    def __init__(self, equation, is_correct, rng, params):
+        self.equation = equation
+        self.is_correct = is_correct
+        self.rng = rng
+        self.rect = pygame.Rect(0, 0, params["ANIMAL_SIZE"], params["ANIMAL_SIZE"])
+        self.rect.midbottom = (rng.randint(SCREEN_WIDTH, SCREEN_WIDTH + 400), SCREEN_HEIGHT)
+        self.mask = get_mask("insect.png", (params["ANIMAL_SIZE"], params["ANIMAL_SIZE"]))
+        self.speed = rng.randint(params["INSECT_SPEED_MIN"], params["INSECT_SPEED_MAX"])
+
+    def update(self):
+        self.rect.x -= self.speed
+        if self.rect.right < 0:
+            self.rect.left = self.rng.randint(SCREEN_WIDTH, SCREEN_WIDTH + 400)
+
+# ----- QUESTION GENERATORS -----
+def generate_math_question(rng, params):
+    num1 = rng.randint(1, 10)
+    num2 = rng.randint(1, 10)
+    correct = num1 + num2
+    question_text = f"{num1} + {num2} = ?"
+    answers = [correct]
+    while len(answers) < 3:
+        wrong = correct + rng.choice([-3, -2, -1, 1, 2, 3])
+        if wrong not in answers and wrong > 0:
+            answers.append(wrong)
+    rng.shuffle(answers)
+    animals = [Animal(ans, ans == correct, rng, params) for ans in answers]
+    return question_text, animals
+
+def generate_unemployed_addition_question(rng, params):
+    num = rng.randint(5, 15)
+    unknown = rng.randint(1, num - 1)
+    correct = num - unknown
+    question_text = f"X + {unknown} = {num} (Find X)"
+    answers = [correct]
+    while len(answers) < 3:
+        wrong = correct + rng.choice([-3, -2, -1, 1, 2, 3])
+        if wrong not in answers and wrong > 0:
+            answers.append(wrong)
+    rng.shuffle(answers)
+    animals = [Animal(ans, ans == correct, rng, params) for ans in answers]
+    return question_text, animals
+
+def generate_chemical_equation(rng, params):
+    equations = [
+        ("H2 + O2 → ?", "H2O"),
+        ("CO2 + H2O → ? + O2", "C6H12O6"),
+        ("Na + Cl2 → ?", "NaCl"),
+        ("CaO + H2O → ?", "Ca(OH)2")
+    ]
+    eq, correct = rng.choice(equations)
+    question_text = f"What is the product of this reaction: {eq}?"
+    wrongs = [e[1] for e in equations if e[1] != correct]
+    rng.shuffle(wrongs)
+    answers = [correct] + wrongs[:2]
+    rng.shuffle(answers)
+    animals = [Animal(ans, ans == correct, rng, params) for ans in answers]
+    return question_text, animals
+
+QUESTION_TYPES = {
+    "math": generate_math_question,
+    "chemical": generate_chemical_equation,
+    "unemployed_addition": generate_unemployed_addition_question,
+}
+
+# ----- GAME -----
+class Game:
+    def __init__(self, seed=None, params=None, question_types=None):
+        self.setup(seed, params, question_types, [SCREEN_WIDTH // 2])
+        self.score = 0
+        self.high_score = HIGH_SCORE
+        self.lives = LIVES
+        self.show_congrats = False
+        self.congrats_timer = 0
+        self.won = False
+        self.new_question()
+
+    # What every mode has: rules, RNG, frame counter and players. The
+    # single-player view (player, step) is player 0.
+    def setup(self, seed, params, question_types, anchors):
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self.rng = GameRandom(seed)
+        self.question_types = list(question_types or QUESTION_TYPES)
+        self.frame = 0
+        self.show_gameover = False
+        self.gameover_timer = 0
+        self.players = [Player(self.params, x) for x in anchors]
+        self.player = self.players[0]
+
+    def new_question(self):
+        self.question_type = self.rng.choice(self.question_types)
+        self.question, self.animals = QUESTION_TYPES[self.question_type](self.rng, self.params)
+        self.question_frame = self.frame
+
+    @property
+    def over(self):
+        return self.show_gameover and self.frame - self.gameover_timer > GAMEOVER_FRAMES
+
+    # One frame of the main loop. inputs holds one (descend, release) pair
+    # per player. Returns (player index, "correct" or "wrong") or None.
+    def step_all(self, inputs):
+        self.frame += 1
+        for player, (descend, release) in zip(self.players, inputs):
+            if descend:
+                player.descend()
+            if release:
+                player.stop_descending()
+
+        catch = None
+        if not self.show_gameover:
+            for player in self.players:
+                player.update()
+            for animal in self.animals:
+                animal.update()
+            catch = self.check_catches()
+        self.update_timers()
+        return catch
+
+    # One frame with only player 0's input. Returns "correct", "wrong" or None.
+    def step(self, descend=False, release=False):
+        catch = self.step_all([(descend, release)])
+        return catch and catch[1]
+
+    def check_order(self):
+        return range(len(self.players))
+
+    def check_catches(self):
+        for i in self.check_order():
+            player = self.players[i]
+            for animal in self.animals:
+                if masks_overlap(player.rect, player.mask, animal.rect, animal.mask):
+                    self.caught(i, animal.is_correct)
+                    return i, "correct" if animal.is_correct else "wrong"
+        return None
+
+    def caught(self, i, correct):
+        if correct:
+            self.score += 10
+            if self.score > self.high_score and not self.show_congrats:
+                self.show_congrats = True
+                self.congrats_timer = self.frame
+                self.high_score = self.score
+                self.won = True
+            self.new_question()
+        else:
+            self.lives -= 1
+            if self.lives <= 0:
+                self.show_gameover = True
+                self.gameover_timer = self.frame
+            else:
+                self.new_question()
+
+    def update_timers(self):
+        if self.show_congrats and self.frame - self.congrats_timer >= CONGRATS_FRAMES:
+            self.show_congrats = False
+
+# ----- VERSUS -----
+class VersusGame(Game):
+    # Two players race on one question stream over the same insects. A hit
+    # by either player serves the next question to both; the first to
+    # TARGET_SCORE wins, running out of lives loses.
+    def __init__(self, seed=None, params=None, question_types=None):
+        self.setup(seed, params, question_types, PLAYER_ANCHORS)
+        self.scores = [0, 0]
+        self.lives = [LIVES, LIVES]
+        self.winner = -1
+        self.new_question()
+
+    @property
+    def score(self):
+        return self.scores[0]
+
+    # Alternate who is checked first so same-frame hits don't always favour player 0
+    def check_order(self):
+        return (0, 1) if self.frame % 2 == 0 else (1, 0)
+
+    def caught(self, i, correct):
+        if correct:
+            self.scores[i] += 10
+        else:
+            self.lives[i] -= 1
+        if self.scores[i] >= TARGET_SCORE or self.lives[i] <= 0:
+            self.show_gameover = True
+            self.gameover_timer = self.frame
+            self.winner = i if self.scores[i] >= TARGET_SCORE else 1 - i
+        else:
+            self.new_question()
+
+    def update_timers(self):
+        pass
+
+# python sim.py: two equally skilled bots should split versus wins evenly
+if __name__ == "__main__":
+    from bot import SKILL_PARAMS, Bot
+
+    wins = [0, 0]
+    for seed in range(100):
+        game = VersusGame(seed)
+        bots = [Bot(game, player, reaction=SKILL_PARAMS["REACTION_FRAMES"], noise=SKILL_PARAMS["TIMING_NOISE"],
+                    rng=random.Random(seed * 2 + i)) for i, player in enumerate(game.players)]
+        while not game.over and game.frame < 5 * 60 * FPS:
+            game.step_all([bot.act() for bot in bots])
+        if game.winner >= 0:
+            wins[game.winner] += 1
+    decided = sum(wins)
+    assert decided and min(wins) >= 0.35 * decided, f"versus is lopsided: wins {wins}"
+    print(f"versus wins {wins[0]} : {wins[1]} over {decided} decided games")
@@ -0,0 +1,179 @@
+import struct
+import timeit
+
+import pygame
+
+from masks import get_mask
+from sim import QUESTION_TYPES, Animal, Game
+
+# ----- LAYOUT -----
+# Every snapshot has the same size, so snapshots can live side by side in
+# one preallocated bytearray (see the rollback ring in netplay.py).
+MAGIC = b"CMSN"
+VERSUS_MAGIC = b"CMVS"
+VERSION = 2
+MAX_ANIMALS = 3
+TYPE_NAMES = list(QUESTION_TYPES)
+
+HEADER_FORMAT = "4sH"
+GAME_FORMAT = "IiiiB???III96sB"           # frame .. question text, animal count
+VERSUS_FORMAT = "IB?bII96sBiiii"          # frame .. animal count, scores, lives
+PLAYER_FORMAT = "ddd4i"                   # angle, swing_speed, descend_speed, rect
+ANIMAL_FORMAT = "?i16s?i4i"               # equation is str?, int value, str value, is_correct, speed, rect
+RNG_FORMAT = "Q?d"                        # GameRandom state, gauss_next
+
+SNAPSHOT = struct.Struct("<" + HEADER_FORMAT + GAME_FORMAT + PLAYER_FORMAT
+                         + ANIMAL_FORMAT * MAX_ANIMALS + RNG_FORMAT)
+SNAPSHOT_SIZE = SNAPSHOT.size
+VERSUS_SNAPSHOT = struct.Struct("<" + HEADER_FORMAT + VERSUS_FORMAT + PLAYER_FORMAT * 2
+                                + ANIMAL_FORMAT * MAX_ANIMALS + RNG_FORMAT)
+VERSUS_SNAPSHOT_SIZE = VERSUS_SNAPSHOT.size
+EMPTY_ANIMAL = (False, 0, b"", False, 0, 0, 0, 0, 0)
+
+def new_buffer(count=1, size=SNAPSHOT_SIZE):
+    return bytearray(size * count)
+
+# ----- FIELDS -----
+def player_values(player):
+    return (player.angle, player.swing_speed, player.descend_speed, *player.rect)
+
+def restore_player(player, values, pos):
+    player.angle, player.swing_speed, player.descend_speed = values[pos:pos + 3]
+    player.rect.update(values[pos + 3:pos + 7])
+    return pos + 7
+
+def animal_values(animals):
+    values = []
+    for animal in animals:
+        is_str = isinstance(animal.equation, str)
+        values += (is_str, 0 if is_str else animal.equation, animal.equation.encode() if is_str else b"",
+                   animal.is_correct, animal.speed, *animal.rect)
+    for _ in range(MAX_ANIMALS - len(animals)):
+        values += EMPTY_ANIMAL
+    return values
+
+def restore_animals(game, values, pos, count):
+    # Reuse the existing Animal objects when the count matches
+    animals = game.animals if len(game.animals) == count else []
+    for i in range(count):
+        if i == len(animals):
+            animal = Animal.__new__(Animal)
+            animal.rng = game.rng
+            animal.rect = pygame.Rect(0, 0, 0, 0)
+            animal.mask = get_mask("insect.png", (game.params["ANIMAL_SIZE"], game.params["ANIMAL_SIZE"]))
+            animals.append(animal)
+        animal = animals[i]
+        is_str, int_value, str_value, animal.is_correct, animal.speed = values[pos:pos + 5]
+        animal.equation = str_value.rstrip(b"\0").decode() if is_str else int_value
+        animal.rect.update(values[pos + 5:pos + 9])
+        pos += 9
+    game.animals = animals
+    return pos + 9 * (MAX_ANIMALS - count)
+
+def rng_values(rng):
+    state, gauss = rng.getstate()
+    return (state, gauss is not None, gauss or 0.0)
+
+def restore_rng(rng, values, pos):
+    state, has_gauss, gauss = values[pos:pos + 3]
+    rng.setstate((state, gauss if has_gauss else None))
+
+def check_header(values, magic):
+    if values[0] != magic or values[1] != VERSION:
+        raise ValueError("not a game snapshot")
+
+# ----- SAVE / RESTORE -----
+def save(game, buf=None, offset=0):
+    if buf is None:
+        buf = new_buffer()
+    SNAPSHOT.pack_into(
+        buf, offset, MAGIC, VERSION,
+        game.frame, game.score, game.high_score, game.lives, TYPE_NAMES.index(game.question_type),
+        game.show_congrats, game.show_gameover, game.won,
+        game.congrats_timer, game.gameover_timer, game.question_frame,
+        game.question.encode(), len(game.animals),
+        *player_values(game.player), *animal_values(game.animals), *rng_values(game.rng))
+    return buf
+
+def restore(game, buf, offset=0):
+    values = SNAPSHOT.unpack_from(buf, offset)
+    check_header(values, MAGIC)
+    (game.frame, game.score, game.high_score, game.lives, type_index,
+     game.show_congrats, game.show_gameover, game.won,
+     game.congrats_timer, game.gameover_timer, game.question_frame,
+     question, count) = values[2:15]
+    game.question_type = TYPE_NAMES[type_index]
+    game.question = question.rstrip(b"\0").decode()
+    pos = restore_player(game.player, values, 15)
+    pos = restore_animals(game, values, pos, count)
+    restore_rng(game.rng, values, pos)
+    return game
+
+def save_versus(game, buf=None, offset=0):
+    if buf is None:
+        buf = new_buffer(size=VERSUS_SNAPSHOT_SIZE)
+    VERSUS_SNAPSHOT.pack_into(
+        buf, offset, VERSUS_MAGIC, VERSION,
+        game.frame, TYPE_NAMES.index(game.question_type), game.show_gameover, game.winner,
+        game.gameover_timer, game.question_frame, game.question.encode(), len(game.animals),
+        *game.scores, *game.lives,
+        *player_values(game.players[0]), *player_values(game.players[1]),
+        *animal_values(game.animals), *rng_values(game.rng))
+    return buf
+
+def restore_versus(game, buf, offset=0):
+    values = VERSUS_SNAPSHOT.unpack_from(buf, offset)
+    check_header(values, VERSUS_MAGIC)
+    (game.frame, type_index, game.show_gameover, game.winner,
+     game.gameover_timer, game.question_frame, question, count) = values[2:10]
+    game.scores[:] = values[10:12]
+    game.lives[:] = values[12:14]
+    game.question_type = TYPE_NAMES[type_index]
+    game.question = question.rstrip(b"\0").decode()
+    pos = restore_player(game.players[0], values, 14)
+    pos = restore_player(game.players[1], values, pos)
+    pos = restore_animals(game, values, pos, count)
+    restore_rng(game.rng, values, pos)
+    return game
+
+# ----- FILES -----
+def dump(game, path):
+    with open(path, "wb") as f:
+        f.write(save(game))
+
+def load(game, path):
+    with open(path, "rb") as f:
+        return restore(game, f.read())
+
+# ----- BENCHMARK -----
+def state_of(game):
+    return (save(game), game.question, [(a.equation, a.is_correct, a.speed, tuple(a.rect)) for a in game.animals])
+
+if __name__ == "__main__":
+    from bot import Bot
+
+    game = Game(seed=1)
+    bot = Bot(game)
+    for _ in range(500):
+        game.step(*bot.act())
+
+    buf = save(game)
+    inputs, expected = [], []
+    for _ in range(600):
+        inputs.append(bot.act())
+        game.step(*inputs[-1])
+        expected.append(state_of(game))
+    restore(game, buf)
+    for keys, want in zip(inputs, expected):
+        game.step(*keys)
+        assert state_of(game) == want, f"replay diverged at frame {game.frame}"
+    print(f"restore + replay of {len(expected)} frames matches")
+
+    number = 20000
+    save_us = timeit.timeit(lambda: save(game, buf), number=number) / number * 1e6
+    restore_us = timeit.timeit(lambda: restore(game, buf), number=number) / number * 1e6
+    step_us = timeit.timeit(lambda: game.step(), number=number) / number * 1e6
+    print(f"snapshot size: {SNAPSHOT_SIZE} bytes")
+    print(f"save:    {save_us:.2f} us")
+    print(f"restore: {restore_us:.2f} us")
+    print(f"step:    {step_us:.2f} us (for comparison)")
@@ -0,0 +1,197 @@
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from bot import SKILL_PARAMS
+from evaluate import MAX_FRAMES, play, summarize
+from sim import DEFAULT_PARAMS, SIM_VERSION
+
+# ----- CONFIG -----
+CACHE_DIR = ".sweep_cache"
+METRICS = ["win_rate", "avg_score", "accuracy", "time_to_answer", "crashes"]
+# The sim constants plus how well the bot plays
+PARAMS = {**DEFAULT_PARAMS, **SKILL_PARAMS}
+
+# ----- PARAMETER SPACE -----
+# Bad specs raise ValueError with a message meant for the command line.
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"{text!r} is not a number") from None
+
+# Returns {name: [v1, v2, ...]} for a grid, or {name: (low, high)} for random sampling.
+def parse_axes(specs, sample=False):
+    axes = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in PARAMS:
+            raise ValueError(f"unknown parameter {name!r}, expected one of {', '.join(PARAMS)}")
+        if not sample:
+            axes[name] = [parse_value(v) for v in values.split(",")]
+            continue
+        bounds = values.split(":")
+        if len(bounds) != 2:
+            raise ValueError(f"{spec!r}: --random needs NAME=low:high")
+        low, high = (parse_value(v) for v in bounds)
+        if low > high:
+            raise ValueError(f"{spec!r}: low is above high")
+        axes[name] = (low, high)
+    return axes
+
+def grid_points(axes):
+    names = list(axes)
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes.values())]
+
+def random_points(axes, count, seed):
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        point = {}
+        for name, (low, high) in axes.items():
+            if isinstance(low, int) and isinstance(high, int):
+                point[name] = rng.randint(low, high)
+            else:
+                point[name] = round(rng.uniform(low, high), 4)
+        points.append(point)
+    return points
+
+def valid(point):
+    params = {**PARAMS, **point}
+    return params["INSECT_SPEED_MIN"] <= params["INSECT_SPEED_MAX"]
+
+# ----- CACHE -----
+def point_key(params, games, seed, max_frames):
+    blob = json.dumps({"params": {**PARAMS, **params}, "games": games, "seed": seed,
+                       "max_frames": max_frames, "sim": SIM_VERSION}, sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+def load_cached(key):
+    path = os.path.join(CACHE_DIR, key + ".json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return None
+
+def store_cached(key, summary):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = os.path.join(CACHE_DIR, key + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(summary, f)
+    os.replace(tmp, os.path.join(CACHE_DIR, key + ".json"))
+
+# ----- SIMULATION -----
+def run_point(params, games, seed, max_frames):
+    params = {**PARAMS, **params}
+    return summarize([play(s, params, max_frames=max_frames) for s in range(seed, seed + games)])
+
+def sweep(points, games, seed, max_frames, workers=None):
+    results = [None] * len(points)
+    pending = {}
+    for i, point in enumerate(points):
+        results[i] = load_cached(point_key(point, games, seed, max_frames))
+    todo = [i for i, r in enumerate(results) if r is None]
+    print(f"{len(points)} points, {len(points) - len(todo)} cached, {len(todo)} to simulate", file=sys.stderr)
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for i in todo:
+                pending[pool.submit(run_point, points[i], games, seed, max_frames)] = i
+            for done, future in enumerate(as_completed(pending), 1):
+                i = pending[future]
+                results[i] = future.result()
+                store_cached(point_key(points[i], games, seed, max_frames), results[i])
+                print(f"  [{done}/{len(todo)}] {points[i]}", file=sys.stderr)
+    return list(zip(points, results))
+
+# ----- OUTPUT -----
+def format_table(rows, sort_by):
+    names = sorted({name for point, _ in rows for name in point})
+    header = "".join(f"{n:>19}" for n in names) + "".join(f"{m:>15}" for m in METRICS)
+    lines = [header]
+    # Metrics that can be NaN (no correct answers) sort last
+    def key(row):
+        value = row[1][sort_by]
+        return (math.isnan(value), 0 if math.isnan(value) else value)
+    for point, summary in sorted(rows, key=key):
+        lines.append("".join(f"{point.get(n, ''):>19}" for n in names)
+                     + "".join(f"{summary[m]:>15.3f}" for m in METRICS))
+    return "\n".join(lines)
+
+def write_csv(rows, path):
+    names = sorted({name for point, _ in rows for name in point})
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(names + METRICS)
+        for point, summary in rows:
+            writer.writerow([point.get(n) for n in names] + [summary[m] for m in METRICS])
+
+# Averages the metric over every other swept parameter.
+def heatmap(rows, x, y, metric):
+    cells = {}
+    for point, summary in rows:
+        cells.setdefault((point[y], point[x]), []).append(summary[metric])
+    xs = sorted({point[x] for point, _ in rows})
+    ys = sorted({point[y] for point, _ in rows})
+    grid = [[sum(cells[(yv, xv)]) / len(cells[(yv, xv)]) if (yv, xv) in cells else None for xv in xs] for yv in ys]
+    return xs, ys, grid
+
+def write_heatmap(rows, x, y, metric, path):
+    xs, ys, grid = heatmap(rows, x, y, metric)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([f"{y} \\ {x}"] + xs)
+        for yv, row in zip(ys, grid):
+            writer.writerow([yv] + row)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sweep the difficulty constants with headless bot games.",
+        epilog="grid: SWING_SPEED=0,0.05,0.1   random: SWING_SPEED=0:0.1 (with --random N)")
+    parser.add_argument("axes", nargs="+", help="NAME=v1,v2,... or NAME=low:high")
+    parser.add_argument("--random", type=int, default=0, help="sample N random points instead of the full grid")
+    parser.add_argument("--games", type=int, default=100, help="games per point")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sort", choices=METRICS, default="win_rate")
+    parser.add_argument("--csv", help="write every point to this CSV file")
+    parser.add_argument("--heatmap", nargs=2, metavar=("X", "Y"), help="write a metric grid over two parameters")
+    parser.add_argument("--metric", choices=METRICS, default="win_rate", help="metric for --heatmap")
+    parser.add_argument("--heatmap-out", default="heatmap.csv")
+    args = parser.parse_args()
+
+    try:
+        axes = parse_axes(args.axes, sample=bool(args.random))
+    except ValueError as e:
+        parser.error(str(e))
+    for name in args.heatmap or ():
+        if name not in axes:
+            parser.error(f"--heatmap axis {name} is not one of the swept parameters")
+    points = random_points(axes, args.random, args.seed) if args.random else grid_points(axes)
+    skipped = len(points)
+    points = [p for p in points if valid(p)]
+    skipped -= len(points)
+    if skipped:
+        print(f"skipping {skipped} points with INSECT_SPEED_MIN above INSECT_SPEED_MAX", file=sys.stderr)
+    if not points:
+        parser.error("no valid points to simulate")
+    rows = sweep(points, args.games, args.seed, args.max_frames, args.workers)
+
+    print(format_table(rows, args.sort))
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.heatmap:
+        write_heatmap(rows, *args.heatmap, args.metric, args.heatmap_out)